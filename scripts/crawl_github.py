@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""抓取 GitHub 上的 Typecho 插件/主题，更新 repo.json 索引。
+
+通过 GitHub Search API 找到候选仓库，再从 raw.githubusercontent.com
+拉取 Plugin.php / index.php 解析头部注释块（@package / @author /
+@version / @link），生成与 repo.json 同构的项目条目。已有条目（按
+link 去重）一律保留，人工维护的内容优先。
+
+用法::
+
+    GITHUB_TOKEN=xxx python scripts/crawl_github.py --limit 20 --pages 3
+
+依赖: requests, aiohttp
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import functools
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import aiohttp
+
+try:  # niquests 与 requests 接口兼容，装了就能对 GitHub API 走 HTTP/2 多路复用
+    import niquests as requests
+    from niquests.adapters import HTTPAdapter
+    from urllib3_future.util.retry import Retry
+except ImportError:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+try:  # 装了 orjson 就用，序列化/反序列化快一个量级
+    import orjson
+except ImportError:
+    orjson = None
+
+API_BASE = "https://api.github.com"
+RAW_BASE = "https://raw.githubusercontent.com"
+REPO_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "repo.json")
+# raw 文件的 ETag 缓存，重跑时未变更的文件走 304 不传正文
+RAW_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".raw_cache.json")
+
+# Search API 查询词（按 star 降序取前若干页）
+SEARCH_QUERIES = {
+    "plugin": "typecho plugin in:name,description,topics",
+    "theme": "typecho theme in:name,description,topics",
+}
+
+# 每类项目在仓库根目录下应存在的入口文件
+CANDIDATE_PATHS = {
+    "plugin": ("Plugin.php",),
+    "theme": ("index.php",),
+}
+
+# 同时在途的 raw 拉取数上限
+FETCH_CONCURRENCY = 32
+
+# 头部注释块和 class Xxx_Plugin 声明都在文件开头，只拉这么多字节
+HEAD_BYTES = 16 * 1024
+
+# 主语言是这些时基本不会带根目录 Plugin.php，插件候选可直接跳过。
+# 注意 language 只是字节占比最高的语言：带编辑器/播放器等 vendor 资源的
+# 插件常显示为 JavaScript/CSS/HTML，所以前端语言不能进这个名单。
+NON_PHP_LANGUAGES = frozenset({
+    "Go", "Rust", "Python", "Java", "Ruby", "C", "C++", "C#",
+    "Swift", "Kotlin", "Dart", "Shell",
+})
+
+_TOKEN = os.environ.get("GITHUB_TOKEN", "")
+
+# 热路径正则统一在模块级编译，_make_project 每个仓库都会走一遍
+_RE_TAG = re.compile(r"@(package|author|version|link)\s+(.+)", re.I)
+_RE_VERSION_NUM = re.compile(r"(\d+\.\d+(?:\.\d+)?)")
+_RE_SANITIZE = re.compile(r"[^A-Za-z0-9_-]+")
+_RE_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_RE_SLUG_DASH = re.compile(r"-{2,}")
+_RE_TYPECHO_PLUGIN = re.compile(r"^typecho[-_]?plugin[-_]+", re.I)
+_RE_TYPECHO_THEME = re.compile(r"^typecho[-_]?theme[-_]+", re.I)
+_RE_CLASS_PLUGIN = re.compile(r"\bclass\s+([A-Za-z0-9_]+)_Plugin\b")
+
+# ASCII 名称走 str.translate 快路径：小写化、非字母数字一律映射成 "-"
+_SLUG_TABLE = {
+    c: chr(c).lower() if chr(c).isalnum() else "-" for c in range(128)
+}
+
+
+@dataclass
+class GithubRepo:
+    full_name: str
+    html_url: str
+    description: str
+    default_branch: str
+    stargazers_count: int
+    language: str
+
+
+def _session() -> requests.Session:
+    """整个抓取过程共用一个 Session：复用连接池，避免反复 TLS 握手。"""
+    s = requests.Session()
+    # 认证等公共头只在建 Session 时拼一次，不在每次请求时重建
+    s.headers.update({
+        "User-Agent": "craft-typecho-crawler",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    })
+    if _TOKEN:
+        s.headers["Authorization"] = f"Bearer {_TOKEN}"
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        ),
+    )
+    s.mount("https://", adapter)
+    return s
+
+
+def _gh_get_json(s: requests.Session, path: str, params: dict | None = None):
+    if params:
+        # 预先转成 str，省掉 urlencode 里对每个值的类型判断
+        params = {k: v if isinstance(v, str) else str(v) for k, v in params.items()}
+    r = s.get(API_BASE + path, params=params, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+def _search_repos(s: requests.Session, kinds: tuple[str, ...], pages: int) -> dict[str, list[GithubRepo]]:
+    """按 star 降序搜索候选仓库，跨页去重。
+
+    两个搜索词 × pages 页的请求互相独立，放进同一个线程池并发执行
+    （Session 的 GET 线程安全，连接池在 _session 中已按并发调大）。
+    worker 数压在 4，避开 GitHub 搜索接口的二级限流。
+    """
+    def one_page(kind: str, page: int) -> dict:
+        return _gh_get_json(s, "/search/repositories", params={
+            "q": SEARCH_QUERIES[kind],
+            "sort": "stars",
+            "order": "desc",
+            "per_page": 50,
+            "page": page,
+        })
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {
+            (kind, page): pool.submit(one_page, kind, page)
+            for kind in kinds
+            for page in range(1, pages + 1)
+        }
+        results = {key: fut.result() for key, fut in futures.items()}
+
+    repos: dict[str, list[GithubRepo]] = {kind: [] for kind in kinds}
+    for kind in kinds:
+        seen: set[str] = set()
+        for page in range(1, pages + 1):
+            for item in results[kind, page].get("items", []):
+                full_name = item["full_name"]
+                if full_name in seen:
+                    continue
+                seen.add(full_name)
+                repos[kind].append(GithubRepo(
+                    full_name=full_name,
+                    html_url=item["html_url"],
+                    description=item.get("description") or "",
+                    default_branch=item.get("default_branch") or "master",
+                    stargazers_count=item.get("stargazers_count") or 0,
+                    language=item.get("language") or "",
+                ))
+    return repos
+
+
+def _scan_php_head(text: str) -> tuple[str, str]:
+    """对文件头部（最多 HEAD_BYTES）做一次扫描。
+
+    返回 (注释块原文, 插件类名前缀)。注释块和 ``class Xxx_Plugin``
+    声明都在文件开头，共用同一个 head 切片，类名从注释块结束处接着
+    找，不对正文各扫一遍。
+    """
+    head = text[:HEAD_BYTES]
+    block = ""
+    pos = 0
+    start = head.find("/**")
+    if start >= 0:
+        end = head.find("*/", start + 3)
+        if end >= 0:
+            block = head[start:end + 2]
+            pos = end + 2
+    m = _RE_CLASS_PLUGIN.search(head, pos)
+    if m is None and pos > 0:
+        # 类声明也可能在第一个注释块之前（如头部无 docblock、方法上有），
+        # 没找到时退回从头再扫一次
+        m = _RE_CLASS_PLUGIN.search(head, 0, pos)
+    return block, m.group(1) if m else ""
+
+
+def _docblock_lines(block: str) -> list[str]:
+    """剥掉注释装饰符，逐行返回注释块正文。"""
+    out: list[str] = []
+    for line in block.splitlines():
+        # /** 和 */ 只按锚定前后缀去掉，避免吃掉 @link 这类 URL 的结尾 /
+        line = line.strip().removeprefix("/**").removesuffix("*/").strip("* \t")
+        if line:
+            out.append(line)
+    return out
+
+
+def _parse_docblock(block: str) -> dict:
+    """从注释块中取 @package/@author/@version/@link 与简介（首行正文）。"""
+    meta = {"package": "", "author": "", "version": "", "link": "", "description": ""}
+    missing = 4
+    for line in _docblock_lines(block):
+        m = _RE_TAG.match(line)
+        if m:
+            key = m.group(1).lower()
+            if not meta[key]:
+                meta[key] = m.group(2).strip()
+                missing -= 1
+                # 四个标签齐了、简介也有了，后面的行不会再改变结果
+                if missing == 0 and meta["description"]:
+                    break
+            continue
+        if not line.startswith("@") and not meta["description"]:
+            meta["description"] = line
+    return meta
+
+
+def _clean_version(raw: str) -> str:
+    m = _RE_VERSION_NUM.search(raw)
+    return m.group(1) if m else raw.strip()
+
+
+def _slugify(name: str) -> str:
+    if name.isascii():
+        slug = name.translate(_SLUG_TABLE)
+    else:
+        slug = _RE_SLUG_NONALNUM.sub("-", name.lower())
+    if "--" in slug:
+        slug = _RE_SLUG_DASH.sub("-", slug)
+    return slug.strip("-") or "project"
+
+
+@functools.lru_cache(maxsize=None)
+def _derive_display_name(repo_name: str) -> str:
+    """去掉仓库名里的 typecho-plugin-/typecho-theme- 前缀。"""
+    name = _RE_TYPECHO_PLUGIN.sub("", repo_name)
+    name = _RE_TYPECHO_THEME.sub("", name)
+    return name or repo_name
+
+
+@functools.lru_cache(maxsize=None)
+def _build_dir(repo_name: str) -> str:
+    return _RE_SANITIZE.sub("-", repo_name).strip("-") or repo_name
+
+
+def _make_project(kind: str, gr: GithubRepo, text: str) -> dict:
+    """由入口文件内容生成一条 repo.json 项目记录。纯 CPU，无网络。"""
+    block, class_prefix = _scan_php_head(text)
+    meta = _parse_docblock(block)
+    owner, _, repo_name = gr.full_name.partition("/")
+    display = meta["package"] or _derive_display_name(repo_name)
+    if kind == "plugin":
+        # Typecho 要求插件目录名与 class Xxx_Plugin 前缀一致
+        dir_name = class_prefix or _build_dir(repo_name)
+    else:
+        dir_name = _build_dir(repo_name)
+    return {
+        "id": _slugify(display),
+        "name": display,
+        "type": kind,
+        "link": gr.html_url,
+        "isGithub": True,
+        "direct": True,
+        "version": _clean_version(meta["version"]),
+        "typecho": "",
+        "author": meta["author"] or owner,
+        "readme": meta["link"],
+        "description": meta["description"] or gr.description,
+        "branch": gr.default_branch,
+        "dir": dir_name,
+    }
+
+
+def _read_json(path: str):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _write_json(path: str, data, indent: bool = True) -> None:
+    """先写同目录 .tmp 再 os.replace，读方永远只会看到完整文件。"""
+    tmp = path + ".tmp"
+    if orjson:
+        opts = orjson.OPT_APPEND_NEWLINE
+        if indent:
+            opts |= orjson.OPT_INDENT_2
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(data, option=opts))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2 if indent else None)
+            f.write("\n")
+    os.replace(tmp, path)
+
+
+def _load_raw_cache() -> dict:
+    try:
+        return _read_json(RAW_CACHE)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_raw_cache(cache: dict) -> None:
+    _write_json(RAW_CACHE, cache, indent=False)
+
+
+async def _fetch_raw(session: aiohttp.ClientSession, gr: GithubRepo, path: str,
+                     cache: dict) -> str | None:
+    url = f"{RAW_BASE}/{gr.full_name}/{gr.default_branch}/{path}"
+    cached = cache.get(url)
+    headers = {"Range": f"bytes=0-{HEAD_BYTES - 1}"}
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+    async with session.get(url, headers=headers) as resp:
+        if resp.status == 304:
+            return cached["text"]
+        if resp.status not in (200, 206):
+            return None
+        text = await resp.text(errors="replace")
+        etag = resp.headers.get("ETag")
+        if etag:
+            cache[url] = {"etag": etag, "text": text}
+        return text
+
+
+async def _collect_async(kind: str, repos: list[GithubRepo], limit: int,
+                         cache: dict) -> list[dict]:
+    """并发拉取入口文件并解析；凑够 limit 条即提前停止。"""
+    if kind == "plugin":
+        skipped = [gr.full_name for gr in repos if gr.language in NON_PHP_LANGUAGES]
+        if skipped:
+            print(f"  按主语言跳过 {len(skipped)} 个仓库: " + ", ".join(skipped),
+                  file=sys.stderr)
+            repos = [gr for gr in repos if gr.language not in NON_PHP_LANGUAGES]
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit_per_host=16, limit=64)
+    timeout = aiohttp.ClientTimeout(total=30)
+    projects: list[dict] = []
+
+    async def fetch(gr: GithubRepo):
+        async with sem:
+            for path in CANDIDATE_PATHS[kind]:
+                try:
+                    text = await _fetch_raw(session, gr, path, cache)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    # 单个仓库的瞬时网络故障按未命中处理，不中断整轮
+                    continue
+                if text is not None:
+                    return gr, text
+            return gr, None
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        tasks = [asyncio.create_task(fetch(gr)) for gr in repos]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                gr, text = await fut
+                # _make_project 全程是字符串/正则操作，入参合法就不会抛；
+                # 这里只做廉价校验，不再套整块 try/except。
+                if not text or "<?php" not in text or "/" not in gr.full_name:
+                    continue
+                projects.append(_make_project(kind, gr, text))
+                if len(projects) >= limit:
+                    break
+        finally:
+            for t in tasks:
+                t.cancel()
+    return projects
+
+
+def collect(kind: str, repos: list[GithubRepo], limit: int, cache: dict) -> list[dict]:
+    return asyncio.run(_collect_async(kind, repos, limit, cache))
+
+
+@dataclass
+class _MergeIndex:
+    """projects 的去重索引，整轮只建一次，合并时增量更新。"""
+    by_link: dict
+    used_ids: set
+    next_suffix: dict
+
+    @classmethod
+    def from_projects(cls, projects: list[dict]) -> "_MergeIndex":
+        return cls(
+            by_link={p["link"].rstrip("/").lower(): p for p in projects},
+            used_ids={p["id"] for p in projects},
+            next_suffix={},
+        )
+
+
+def _merge_projects(projects: list[dict], found: list[dict], index: _MergeIndex) -> int:
+    """把抓到的条目并入 projects，按 link 去重、id 冲突加序号后缀。"""
+    added = 0
+    for proj in found:
+        key = proj["link"].rstrip("/").lower()
+        if key in index.by_link:
+            continue
+        pid = proj["id"]
+        if pid in index.used_ids:
+            n = index.next_suffix.get(pid, 2)
+            while f"{pid}-{n}" in index.used_ids:
+                n += 1
+            index.next_suffix[pid] = n + 1
+            pid = f"{pid}-{n}"
+        proj["id"] = pid
+        index.used_ids.add(pid)
+        index.by_link[key] = proj
+        projects.append(proj)
+        added += 1
+    return added
+
+
+def main(argv: list[str] | None = None) -> int:
+    global _TOKEN
+    ap = argparse.ArgumentParser(description="抓取 GitHub 更新 repo.json 索引")
+    ap.add_argument("--limit", type=int, default=20, help="每类最多新增条数")
+    ap.add_argument("--pages", type=int, default=3, help="每个搜索词抓取页数")
+    ap.add_argument("--token", default=_TOKEN, help="GitHub Token（默认取 GITHUB_TOKEN）")
+    args = ap.parse_args(argv)
+    _TOKEN = args.token
+
+    data = _read_json(REPO_JSON)
+    projects = data["projects"]
+
+    s = _session()
+    kinds = ("plugin", "theme")
+    candidates = _search_repos(s, kinds, args.pages)
+    cache = _load_raw_cache()
+    index = _MergeIndex.from_projects(projects)
+    total = 0
+    for kind in kinds:
+        repos = candidates[kind]
+        print(f"{kind}: 候选仓库 {len(repos)} 个")
+        found = collect(kind, repos, args.limit, cache)
+        total += _merge_projects(projects, found, index)
+    _save_raw_cache(cache)
+
+    data["updatedAt"] = dt.date.today().isoformat()
+    _write_json(REPO_JSON, data)
+    print(f"新增 {total} 个项目，索引共 {len(projects)} 个")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())